@@ -9,6 +9,20 @@ import time
 import subprocess
 import re
 import shutil
+import threading
+import collections
+import platform
+import signal
+
+# Victron libraries are only needed for the D-Bus input mode
+sys.path.insert(1, os.path.join(os.path.dirname(__file__), 'ext', 'velib_python'))
+try:
+    from gi.repository import GLib
+    import dbus
+    from vedbus import VeDbusService
+    from settingsdevice import SettingsDevice
+except ImportError:
+    VeDbusService = None
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,6 +36,66 @@ MODULE_PATH = f'/data/RemoteGPIO/{MODULE_NAME}.ko'
 MODULE_CAPACITY = 64
 CONFIG_CHECK_INTERVAL = 10 # Seconds
 DBUS_SERVICE_PATH = '/service/dbus-digitalinputs'
+WRITE_QUEUE_SIZE = 256 # Pending sysfs writes between the MQTT and writer threads
+OVERFLOW_POLICY = 'keep_latest' # keep_latest, drop_oldest or drop_newest
+STALL_WARNING_THRESHOLD = 0.5 # Seconds spent on a single line write before warning
+OVERFLOW_POLICIES = ('keep_latest', 'drop_oldest', 'drop_newest')
+BRIDGE_MODE = 'sysfs' # sysfs (kernel module + dbus-digitalinputs) or dbus (direct D-Bus services)
+BRIDGE_MODES = ('sysfs', 'dbus')
+DBUS_INPUT_SERVICE_PREFIX = 'com.victronenergy.digitalinput'
+DBUS_INPUT_INSTANCE_BASE = 100 # DeviceInstance = base + persistent offset
+
+# Input types as used by dbus-digitalinputs: type -> (product name, (low, high) state)
+INPUT_TYPES = {
+    0: ('Disabled', None),
+    2: ('Door alarm', ('open', 'closed')),
+    3: ('Bilge pump', ('off', 'on')),
+    4: ('Bilge alarm', ('ok', 'alarm')),
+    5: ('Burglar alarm', ('ok', 'alarm')),
+    6: ('Smoke alarm', ('ok', 'alarm')),
+    7: ('Fire alarm', ('ok', 'alarm')),
+    8: ('CO2 alarm', ('ok', 'alarm')),
+    9: ('Generator', ('running', 'stopped')),
+    10: ('Generic I/O', ('low', 'high')),
+}
+DEFAULT_INPUT_TYPE = 10
+COUNT_SAVE_INTERVAL = 60 # Seconds between saving input counters to localsettings
+WRITABLE_INPUT_PATHS = {
+    '/CustomName': 'CustomName',
+    '/Type': 'Type',
+    '/Settings/InvertTranslation': 'InvertTranslation',
+    '/Settings/InvertAlarm': 'InvertAlarm',
+    '/Settings/AlarmSetting': 'AlarmSetting',
+}
+INPUT_STATES = {'low': 0, 'high': 1, 'off': 2, 'on': 3, 'no': 4, 'yes': 5, 'open': 6,
+                'closed': 7, 'ok': 8, 'alarm': 9, 'running': 10, 'stopped': 11}
+
+def get_input_bridge_config(config_path, num_lines=MODULE_CAPACITY):
+    """
+    Reads the optional [input_bridge] section and returns (mode, queue_size, overflow_policy).
+    With keep_latest the queue is raised to num_lines so no line's latest value is ever evicted.
+    """
+    mode, queue_size, overflow_policy = BRIDGE_MODE, WRITE_QUEUE_SIZE, OVERFLOW_POLICY
+    try:
+        config = configparser.ConfigParser()
+        config.read(config_path)
+        if 'input_bridge' in config:
+            section = config['input_bridge']
+            mode = section.get('mode', fallback=mode).strip()
+            queue_size = max(1, section.getint('queue_size', fallback=queue_size))
+            overflow_policy = section.get('overflow_policy', fallback=overflow_policy).strip()
+    except Exception as e:
+        logger.error(f"Error reading input bridge config: {e}")
+    if overflow_policy not in OVERFLOW_POLICIES:
+        logger.warning(f"Unknown overflow policy '{overflow_policy}', using '{OVERFLOW_POLICY}'.")
+        overflow_policy = OVERFLOW_POLICY
+    if mode not in BRIDGE_MODES:
+        logger.warning(f"Unknown bridge mode '{mode}', using '{BRIDGE_MODE}'.")
+        mode = BRIDGE_MODE
+    if overflow_policy == 'keep_latest' and queue_size < num_lines:
+        logger.info(f"Raising queue_size from {queue_size} to {num_lines} so keep_latest holds one slot per line.")
+        queue_size = num_lines
+    return mode, queue_size, overflow_policy
 
 def get_device_configs(config_path):
     """Reads config and returns a dictionary of device configurations."""
@@ -37,6 +111,60 @@ def get_device_configs(config_path):
         logger.error(f"Error reading device configs: {e}")
     return devices
 
+def load_persistent_map(mapping_path):
+    """Loads the unique input id -> offset map that keeps GPIO lines and instances stable."""
+    logger.info(f"Loading persistent GPIO map from {mapping_path}")
+    mapping = {}
+    try:
+        parser = configparser.ConfigParser()
+        parser.optionxform = str # Keep unique ids case-sensitive
+        parser.read(mapping_path)
+        if 'mapping' in parser:
+            for key, value in parser['mapping'].items():
+                mapping[key] = int(value)
+    except Exception:
+        logger.warning(f"Could not load mapping file, will create a new one.")
+    return mapping
+
+def save_persistent_map(mapping_path, mapping):
+    logger.info(f"Saving persistent GPIO map to {mapping_path}")
+    parser = configparser.ConfigParser()
+    parser.optionxform = str
+    parser['mapping'] = {key: str(value) for key, value in mapping.items()}
+    try:
+        with open(mapping_path, 'w') as f:
+            parser.write(f)
+    except Exception as e:
+        logger.error(f"Could not save mapping file: {e}")
+
+def build_input_maps(device_configs, persistent_map):
+    """
+    Assigns an offset to every configured input, keeping the offsets already in persistent_map.
+    Ids are matched case-insensitively so maps saved with lowercased keys keep their offsets.
+    Returns (new_persistent_map, topic_to_unique_id).
+    """
+    new_persistent_map = {}
+    topic_to_unique_id = {}
+    used_offsets = set(persistent_map.values())
+    known_offsets = {key.lower(): value for key, value in persistent_map.items()}
+
+    for cfg in device_configs.values():
+        serial_raw = cfg['serial']
+        num_inputs = int(cfg.get('num_inputs', 0))
+        topic_base = cfg['topic_base']
+        for i in range(1, num_inputs + 1):
+            unique_id = f"{serial_raw}_input_{i}"
+            if unique_id.lower() in known_offsets:
+                offset = known_offsets[unique_id.lower()]
+            else:
+                offset = 0
+                while offset in used_offsets: offset += 1
+                logger.info(f"Assigning new offset {offset} to {unique_id}")
+                used_offsets.add(offset)
+            new_persistent_map[unique_id] = offset
+            topic_to_unique_id[f"{topic_base}/input/{i}"] = unique_id
+    return new_persistent_map, topic_to_unique_id
+
 def manage_kernel_module(module_path, capacity):
     """
     Ensures the kernel module is loaded with a fixed capacity. Does not unload.
@@ -133,6 +261,108 @@ def cleanup_on_exit(active_serials, persistent_map, gpio_base):
     except Exception as e:
         logger.error(f"Error during io-ext cleanup: {e}")
 
+class LineWriteQueue:
+    """
+    Bounded queue of pending (line, value) writes that never blocks the producer.
+    With 'keep_latest' a line already waiting in the queue has its value replaced
+    instead of being queued twice, and a pending line is never evicted for another one.
+    When the queue is full the oldest entry is dropped ('drop_oldest') or the new one
+    is discarded ('drop_newest', and 'keep_latest' if sized below the number of lines).
+    """
+    def __init__(self, maxsize, policy):
+        self.maxsize = maxsize
+        self.policy = policy
+        self._pending = collections.OrderedDict() # key -> (line, value, enqueued_at)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.discarded = 0
+        self.writes = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.max_wait = 0.0
+        self.max_write = 0.0
+        self._write_started = None # Start of the write in progress, if any
+
+    def put(self, line, value):
+        """Queues a write without blocking. Returns False if the write was dropped."""
+        with self._cond:
+            if self.policy == 'keep_latest' and line in self._pending:
+                self._pending[line] = (line, value, self._pending[line][2])
+                self.coalesced += 1
+                return True
+            if len(self._pending) >= self.maxsize:
+                self.dropped += 1
+                if self.policy != 'drop_oldest':
+                    return False
+                self._pending.popitem(last=False)
+            if self.policy == 'keep_latest':
+                key = line
+            else:
+                key = self._seq
+                self._seq += 1
+            self._pending[key] = (line, value, time.monotonic())
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify()
+            return True
+
+    def get(self):
+        """Blocks until a write is available. Returns None once the queue is closed."""
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            return self._pending.popitem(last=False)[1]
+
+    def discard_lines(self, lines):
+        """Drops pending writes for lines that are no longer in use."""
+        with self._cond:
+            for key, item in list(self._pending.items()):
+                if item[0] in lines:
+                    del self._pending[key]
+                    self.discarded += 1
+
+    def begin_write(self):
+        with self._cond:
+            self._write_started = time.monotonic()
+
+    def record_write(self, wait, write_time, ok):
+        with self._cond:
+            self._write_started = None
+            if ok: self.writes += 1
+            else: self.errors += 1
+            self.max_wait = max(self.max_wait, wait)
+            self.max_write = max(self.max_write, write_time)
+
+    def snapshot_and_reset(self):
+        """
+        Returns the current statistics and resets the per-interval maxima.
+        in_flight and oldest_wait are the ages of the current write and of the oldest pending
+        entry, so a writer that is still blocked shows up before its write completes.
+        """
+        with self._cond:
+            now = time.monotonic()
+            stats = {
+                'in_flight': now - self._write_started if self._write_started is not None else 0.0,
+                'oldest_wait': now - min(item[2] for item in self._pending.values()) if self._pending else 0.0,
+                'depth': len(self._pending), 'max_depth': self.max_depth,
+                'writes': self.writes, 'errors': self.errors,
+                'coalesced': self.coalesced, 'dropped': self.dropped, 'discarded': self.discarded,
+                'max_wait': self.max_wait, 'max_write': self.max_write,
+            }
+            self.max_depth = len(self._pending)
+            self.max_wait = 0.0
+            self.max_write = 0.0
+            return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
 class GpioBridge:
     def __init__(self, gpio_base, trigger_path, config_path, mapping_path, module_capacity):
         self.gpio_base = gpio_base
@@ -142,33 +372,16 @@ class GpioBridge:
         self.module_capacity = module_capacity
         self.client = None
         self.mqtt_to_gpio_map = {}
-        self.persistent_map = self._load_persistent_map()
+        self.persistent_map = load_persistent_map(mapping_path)
         self.active_safe_serials = set() # Track dirs we manage
+        _, queue_size, overflow_policy = get_input_bridge_config(config_path, module_capacity)
+        self.write_queue = LineWriteQueue(queue_size, overflow_policy)
+        self.writer_thread = None
+        self.active_lines = set()
+        self._write_lock = threading.Lock() # Held by the writer while it touches sysfs
+        self._last_stats = (0, 0, 0, 0, 0)
         self.reconfigure() # Initial configuration
 
-    def _load_persistent_map(self):
-        logger.info(f"Loading persistent GPIO map from {self.mapping_path}")
-        mapping = {}
-        try:
-            parser = configparser.ConfigParser()
-            parser.read(self.mapping_path)
-            if 'mapping' in parser:
-                for key, value in parser['mapping'].items():
-                    mapping[key] = int(value)
-        except Exception:
-            logger.warning(f"Could not load mapping file, will create a new one.")
-        return mapping
-
-    def _save_persistent_map(self):
-        logger.info(f"Saving persistent GPIO map to {self.mapping_path}")
-        parser = configparser.ConfigParser()
-        parser['mapping'] = {key: str(value) for key, value in self.persistent_map.items()}
-        try:
-            with open(self.mapping_path, 'w') as f:
-                parser.write(f)
-        except Exception as e:
-            logger.error(f"Could not save mapping file: {e}")
-
     def reconfigure(self):
         logger.info("Reconfiguring driver...")
         
@@ -181,29 +394,17 @@ class GpioBridge:
 
         # --- Update Persistent Mapping ---
         old_offsets = set(self.persistent_map.values())
-        new_persistent_map = {}
-        new_mqtt_to_gpio_map = {}
-        used_offsets = set(self.persistent_map.values())
-
-        for cfg in device_configs.values():
-            serial_raw = cfg['serial']
-            num_inputs = int(cfg.get('num_inputs', 0))
-            topic_base = cfg['topic_base']
-            for i in range(1, num_inputs + 1):
-                unique_id = f"{serial_raw}_input_{i}"
-                if unique_id in self.persistent_map:
-                    offset = self.persistent_map[unique_id]
-                else:
-                    offset = 0
-                    while offset in used_offsets: offset += 1
-                    logger.info(f"Assigning new offset {offset} to {unique_id}")
-                    used_offsets.add(offset)
-                new_persistent_map[unique_id] = offset
-                new_mqtt_to_gpio_map[f"{topic_base}/input/{i}"] = offset
+        new_persistent_map, topic_to_unique_id = build_input_maps(device_configs, self.persistent_map)
+        new_mqtt_to_gpio_map = {topic: new_persistent_map[uid] for topic, uid in topic_to_unique_id.items()}
         
         new_offsets = set(new_persistent_map.values())
         offsets_to_export = new_offsets - old_offsets
         offsets_to_unexport = old_offsets - new_offsets
+
+        # --- Stop Writes to Removed Lines Before Unexporting ---
+        with self._write_lock:
+            self.active_lines = new_offsets
+        self.write_queue.discard_lines(offsets_to_unexport)
         
         # --- Update System State ---
         gpio_state_changed = manage_exported_gpios(self.gpio_base, offsets_to_export, offsets_to_unexport)
@@ -248,7 +449,7 @@ class GpioBridge:
             if old_topics - new_topics: self.client.unsubscribe(list(old_topics - new_topics))
             if new_topics - old_topics: self.client.subscribe([(t, 0) for t in new_topics - old_topics])
         
-        self._save_persistent_map()
+        save_persistent_map(self.mapping_path, self.persistent_map)
         
         # --- Restart Victron Service if Needed ---
         if gpio_state_changed:
@@ -258,22 +459,67 @@ class GpioBridge:
         logger.info(f"Reconfiguration complete. Now monitoring {len(self.mqtt_to_gpio_map)} inputs.")
 
     def on_mqtt_message(self, client, userdata, msg):
+        # Runs on paho's network thread: only queue the write, never touch sysfs here.
         virtual_line = self.mqtt_to_gpio_map.get(msg.topic)
         if virtual_line is None: return
         try:
-            gpio_num = self.gpio_base + virtual_line
-            with open(f"/sys/class/gpio/gpio{gpio_num}/direction", 'w') as f: f.write('out')
-            with open(f"/sys/class/gpio/gpio{gpio_num}/value", 'w') as f: f.write(msg.payload.decode())
-            with open(f"/sys/class/gpio/gpio{gpio_num}/direction", 'w') as f: f.write('in')
-            with open(self.trigger_file, "w") as f: f.write(str(virtual_line))
-        except Exception as e:
-            logger.error(f"Error processing message for {msg.topic}: {e}")
+            value = msg.payload.decode()
+        except UnicodeDecodeError as e:
+            logger.error(f"Error decoding message for {msg.topic}: {e}")
+            return
+        if not self.write_queue.put(virtual_line, value):
+            logger.debug(f"Write queue full, dropped update for {msg.topic}")
+
+    def write_line(self, virtual_line, value):
+        gpio_num = self.gpio_base + virtual_line
+        with open(f"/sys/class/gpio/gpio{gpio_num}/direction", 'w') as f: f.write('out')
+        with open(f"/sys/class/gpio/gpio{gpio_num}/value", 'w') as f: f.write(value)
+        with open(f"/sys/class/gpio/gpio{gpio_num}/direction", 'w') as f: f.write('in')
+        with open(self.trigger_file, "w") as f: f.write(str(virtual_line))
+
+    def _writer_loop(self):
+        while True:
+            item = self.write_queue.get()
+            if item is None: break
+            virtual_line, value, enqueued_at = item
+            with self._write_lock:
+                if virtual_line not in self.active_lines: continue
+                started = time.monotonic()
+                self.write_queue.begin_write()
+                try:
+                    self.write_line(virtual_line, value)
+                    ok = True
+                except Exception as e:
+                    ok = False
+                    logger.error(f"Error writing GPIO line {virtual_line}: {e}")
+                write_time = time.monotonic() - started
+            self.write_queue.record_write(started - enqueued_at, write_time, ok)
+            if write_time > STALL_WARNING_THRESHOLD:
+                logger.warning(f"Write to GPIO line {virtual_line} stalled for {write_time:.2f}s")
+
+    def log_queue_stats(self):
+        """Logs writer queue statistics if there was traffic or the writer is stalled, and resets the per-interval maxima."""
+        q = self.write_queue
+        stats = q.snapshot_and_reset()
+        counters = (stats['writes'], stats['errors'], stats['coalesced'], stats['dropped'], stats['discarded'])
+        stalled = max(stats['in_flight'], stats['oldest_wait']) > STALL_WARNING_THRESHOLD
+        if counters == self._last_stats and not stalled: return
+        self._last_stats = counters
+        log = logger.warning if stalled else logger.info
+        log(f"Write queue: depth={stats['depth']}/{q.maxsize} max_depth={stats['max_depth']} "
+                    f"policy={q.policy} writes={stats['writes']} errors={stats['errors']} "
+                    f"coalesced={stats['coalesced']} dropped={stats['dropped']} discarded={stats['discarded']} "
+                    f"max_wait={stats['max_wait']:.3f}s max_write={stats['max_write']:.3f}s "
+                    f"in_flight={stats['in_flight']:.3f}s oldest_wait={stats['oldest_wait']:.3f}s")
 
     def start(self):
         config = configparser.ConfigParser()
         config.read(self.config_path)
         broker_config = config['mqtt_broker']
         
+        self.writer_thread = threading.Thread(target=self._writer_loop, name="GpioWriter", daemon=True)
+        self.writer_thread.start()
+
         self.client = mqtt.Client(1)
         self.client.on_message = self.on_mqtt_message
         
@@ -293,8 +539,323 @@ class GpioBridge:
             self.client.loop_stop()
             self.client.disconnect()
             logger.info("MQTT bridge stopped.")
+        self.write_queue.close()
+        if self.writer_thread:
+            self.writer_thread.join(timeout=5)
 
-if __name__ == "__main__":
+def dbus_connection():
+    """Returns a private bus connection, so each input can own its own service name."""
+    return dbus.SystemBus(private=True) if (platform.machine() == 'armv7l') else dbus.SessionBus(private=True)
+
+def parse_input_level(payload):
+    """Converts an MQTT input payload ('0'/'1', 'ON'/'OFF') to 0 or 1."""
+    value = payload.strip().upper()
+    if value in ('ON', 'HIGH'): return 1
+    if value in ('OFF', 'LOW'): return 0
+    return 1 if int(value) else 0
+
+class DbusDigitalInput:
+    """
+    One com.victronenergy.digitalinput service for a single RGPIO input.
+    Like dbus-digitalinputs, no service is published while the input Type is 0 (Disabled).
+    """
+    def __init__(self, unique_id, serial, index, offset, broker_address):
+        self.unique_id = unique_id
+        self.serial = serial
+        self.index = index
+        self.offset = offset
+        self.broker_address = broker_address
+        self.level = 0
+        serial_safe = serial.replace('-', '_')
+        self.servicename = f'{DBUS_INPUT_SERVICE_PREFIX}.rgpio_{serial_safe}_{index}'
+        self._bus = None
+        self._dbusservice = None
+        self.closed = False
+        self._settings = self._setup_settings()
+        self.count = self._settings['Count']
+        self._apply_type()
+
+    def _setup_settings(self):
+        settings_path_prefix = f'/Settings/DigitalInput/rgpio_{self.offset}'
+        supported_settings = {
+            'CustomName': [f'{settings_path_prefix}/CustomName', f'RGPIO {self.serial} input {self.index}', 0, 0],
+            'Type': [f'{settings_path_prefix}/Type', DEFAULT_INPUT_TYPE, 0, max(INPUT_TYPES)],
+            'InvertTranslation': [f'{settings_path_prefix}/InvertTranslation', 0, 0, 1],
+            'InvertAlarm': [f'{settings_path_prefix}/InvertAlarm', 0, 0, 1],
+            'AlarmSetting': [f'{settings_path_prefix}/AlarmSetting', 0, 0, 1],
+            'Count': [f'{settings_path_prefix}/Count', 0, 0, 0],
+        }
+        bus = dbus.SystemBus() if (platform.machine() == 'armv7l') else dbus.SessionBus()
+        return SettingsDevice(bus, supported_settings, self._handle_setting_changed)
+
+    def _create_service(self):
+        self._bus = dbus_connection()
+        self._dbusservice = VeDbusService(self.servicename, bus=self._bus, register=False)
+
+        self._dbusservice.add_path('/Management/ProcessName', __file__)
+        self._dbusservice.add_path('/Management/ProcessVersion', '3.6')
+        self._dbusservice.add_path('/Management/Connection', f'RGPIO (MQTT): {self.broker_address}')
+
+        self._dbusservice.add_path('/DeviceInstance', DBUS_INPUT_INSTANCE_BASE + self.offset)
+        self._dbusservice.add_path('/ProductId', 19191)
+        self._dbusservice.add_path('/ProductName', self._product_name())
+        self._dbusservice.add_path('/FirmwareVersion', '3.6 (dbus-rgpio-input)')
+        self._dbusservice.add_path('/HardwareVersion', 'N/A')
+        self._dbusservice.add_path('/Connected', 1)
+        self._dbusservice.add_path('/Serial', f'{self.serial}_{self.index}')
+
+        self._dbusservice.add_path('/InputState', 0)
+        self._dbusservice.add_path('/State', 0)
+        self._dbusservice.add_path('/Alarm', 0)
+        self._dbusservice.add_path('/Count', self.count)
+
+        for dbus_path, settings_key in WRITABLE_INPUT_PATHS.items():
+            self._dbusservice.add_path(
+                path=dbus_path,
+                value=self._settings[settings_key],
+                writeable=True,
+                onchangecallback=lambda p, v, key=settings_key: self._handle_writable_setting_change(key, p, v)
+            )
+
+        self._dbusservice.register()
+        logger.info(f"Published D-Bus input {self.servicename}")
+
+    def _release_service(self):
+        if self._dbusservice is None: return
+        self._dbusservice.__del__()
+        self._bus.close()
+        self._dbusservice = None
+        self._bus = None
+        logger.info(f"Released D-Bus input {self.servicename}")
+
+    def _check_type(self):
+        """Resets a Type this mode does not support (e.g. set in localsettings) to the default."""
+        if self._settings['Type'] in INPUT_TYPES: return True
+        logger.warning(f"Input {self.unique_id}: unsupported Type {self._settings['Type']}, "
+                       f"resetting to {DEFAULT_INPUT_TYPE} ({INPUT_TYPES[DEFAULT_INPUT_TYPE][0]}).")
+        self._settings['Type'] = DEFAULT_INPUT_TYPE
+        return False
+
+    def _apply_type(self):
+        """Publishes, releases or refreshes the service to match the Type setting."""
+        if self.closed: return False
+        self._check_type()
+        if self._settings['Type'] == 0:
+            self._release_service()
+        elif self._dbusservice is None:
+            self._create_service()
+            self._update_state()
+        else:
+            self._dbusservice['/ProductName'] = self._product_name()
+            self._update_state()
+        return False
+
+    def _product_name(self):
+        return INPUT_TYPES.get(self._settings['Type'], INPUT_TYPES[DEFAULT_INPUT_TYPE])[0]
+
+    def _handle_writable_setting_change(self, settings_key, dbus_path, value):
+        if settings_key == 'Type' and value not in INPUT_TYPES:
+            return False
+        self._settings[settings_key] = value
+        # Deferred: the service may be released, which cannot happen inside its own callback
+        GLib.idle_add(self._apply_type)
+        return True
+
+    def _handle_setting_changed(self, settings_key, old_value, new_value):
+        # Changes made through localsettings (e.g. the GUI), including re-enabling a disabled input
+        if self.closed or settings_key == 'Count': return
+        if settings_key == 'Type' and not self._check_type(): return
+        if self._dbusservice is not None:
+            for dbus_path, key in WRITABLE_INPUT_PATHS.items():
+                if key == settings_key: self._dbusservice[dbus_path] = new_value
+        GLib.idle_add(self._apply_type)
+
+    def _update_state(self):
+        if self._dbusservice is None: return False
+        translations = INPUT_TYPES.get(self._settings['Type'], INPUT_TYPES[DEFAULT_INPUT_TYPE])[1]
+        self._dbusservice['/InputState'] = self.level
+        if translations is None:
+            self._dbusservice['/State'] = 0
+            self._dbusservice['/Alarm'] = 0
+            return False
+        level = self.level ^ self._settings['InvertTranslation']
+        self._dbusservice['/State'] = INPUT_STATES[translations[level]]
+        alarm_active = self.level ^ self._settings['InvertAlarm']
+        self._dbusservice['/Alarm'] = 2 if (self._settings['AlarmSetting'] and alarm_active) else 0
+        return False
+
+    def update(self, level):
+        if level == self.level: return
+        if self._dbusservice is not None and level and not self.level:
+            self.count += 1
+            self._dbusservice['/Count'] = self.count
+        self.level = level
+        self._update_state()
+
+    def save_count(self):
+        """Writes the counter to localsettings if it changed; called on a timer, not per edge."""
+        if self.count != self._settings['Count']:
+            self._settings['Count'] = self.count
+
+    def close(self):
+        """
+        Saves the counter, releases the service name so the input disappears immediately,
+        and drops the settings signal receivers so a later settings change cannot revive it.
+        """
+        self.save_count()
+        self.closed = True
+        self._release_service()
+        for item in self._settings._values.values():
+            item.__del__()
+
+class DbusInputBridge:
+    """
+    Publishes configured inputs as com.victronenergy.digitalinput services directly,
+    without the kernel module, sysfs GPIOs or dbus-digitalinputs.
+    """
+    def __init__(self, config_path, mapping_path):
+        self.config_path = config_path
+        self.mapping_path = mapping_path
+        self.client = None
+        self.mqtt_to_input_map = {}
+        self.persistent_map = load_persistent_map(mapping_path)
+        self.inputs = {} # unique_id -> DbusDigitalInput
+        config = configparser.ConfigParser()
+        config.read(config_path)
+        self.broker_address = config['mqtt_broker'].get('address', 'N/A') if 'mqtt_broker' in config else 'N/A'
+        self.reconfigure() # Initial configuration
+
+    def reconfigure(self):
+        logger.info("Reconfiguring D-Bus inputs...")
+
+        device_configs = get_device_configs(self.config_path)
+        new_persistent_map, new_mqtt_to_input_map = build_input_maps(device_configs, self.persistent_map)
+
+        # --- Update D-Bus Services (only added/removed inputs are touched) ---
+        for unique_id in set(self.inputs) - set(new_persistent_map):
+            logger.info(f"Removing D-Bus input {unique_id}")
+            self.inputs.pop(unique_id).close()
+
+        for cfg in device_configs.values():
+            serial_raw = cfg['serial']
+            for i in range(1, int(cfg.get('num_inputs', 0)) + 1):
+                unique_id = f"{serial_raw}_input_{i}"
+                if unique_id in self.inputs: continue
+                try:
+                    self.inputs[unique_id] = DbusDigitalInput(
+                        unique_id, serial_raw, i, new_persistent_map[unique_id], self.broker_address)
+                except Exception as e:
+                    logger.error(f"Could not create D-Bus input {unique_id}: {e}")
+
+        # --- Update Internal State ---
+        self.persistent_map = new_persistent_map
+        old_topics = set(self.mqtt_to_input_map.keys())
+        self.mqtt_to_input_map = new_mqtt_to_input_map
+        new_topics = set(self.mqtt_to_input_map.keys())
+
+        # --- Update MQTT Subscriptions ---
+        if self.client and self.client.is_connected():
+            if old_topics - new_topics: self.client.unsubscribe(list(old_topics - new_topics))
+            if new_topics - old_topics: self.client.subscribe([(t, 0) for t in new_topics - old_topics])
+
+        save_persistent_map(self.mapping_path, self.persistent_map)
+        logger.info(f"Reconfiguration complete. Now monitoring {len(self.inputs)} inputs.")
+
+    def on_mqtt_message(self, client, userdata, msg):
+        # Runs on paho's network thread: hand the update over to the GLib main loop.
+        unique_id = self.mqtt_to_input_map.get(msg.topic)
+        if unique_id is None: return
+        try:
+            level = parse_input_level(msg.payload.decode())
+        except (UnicodeDecodeError, ValueError) as e:
+            logger.error(f"Error processing message for {msg.topic}: {e}")
+            return
+        GLib.idle_add(self._update_input, unique_id, level)
+
+    def _update_input(self, unique_id, level):
+        dbus_input = self.inputs.get(unique_id)
+        if dbus_input: dbus_input.update(level)
+        return False
+
+    def save_counts(self):
+        for dbus_input in self.inputs.values():
+            dbus_input.save_count()
+        return True
+
+    def start(self):
+        config = configparser.ConfigParser()
+        config.read(self.config_path)
+        broker_config = config['mqtt_broker']
+
+        self.client = mqtt.Client(1)
+        self.client.on_message = self.on_mqtt_message
+
+        if broker_config.get('username'):
+            self.client.username_pw_set(broker_config['username'], broker_config.get('password'))
+
+        self.client.connect(broker_config['address'], int(broker_config['port']), 60)
+
+        for topic in self.mqtt_to_input_map.keys():
+            self.client.subscribe(topic)
+
+        self.client.loop_start()
+        logger.info("MQTT to D-Bus input bridge started in background.")
+
+    def stop(self):
+        if self.client:
+            self.client.loop_stop()
+            self.client.disconnect()
+            logger.info("MQTT bridge stopped.")
+        for dbus_input in self.inputs.values():
+            dbus_input.close()
+        self.inputs = {}
+
+def run_dbus_bridge():
+    logger.info("--- Starting rgpio D-Bus input bridge ---")
+    if VeDbusService is None:
+        logger.critical("Victron D-Bus libraries are not available. The script will exit.")
+        sys.exit(1)
+
+    from dbus.mainloop.glib import DBusGMainLoop
+    DBusGMainLoop(set_as_default=True)
+
+    bridge = DbusInputBridge(config_path=CONFIG_FILE, mapping_path=MAPPING_FILE)
+    bridge.start()
+
+    last_config_mtime = os.path.getmtime(CONFIG_FILE)
+
+    def check_config():
+        nonlocal last_config_mtime
+        try:
+            current_mtime = os.path.getmtime(CONFIG_FILE)
+            if current_mtime != last_config_mtime:
+                logger.info("Configuration file change detected.")
+                last_config_mtime = current_mtime
+                bridge.reconfigure()
+        except FileNotFoundError:
+            logger.warning(f"Configuration file '{CONFIG_FILE}' not found. Skipping check.")
+        return True
+
+    GLib.timeout_add_seconds(CONFIG_CHECK_INTERVAL, check_config)
+    GLib.timeout_add_seconds(COUNT_SAVE_INTERVAL, bridge.save_counts)
+    mainloop = GLib.MainLoop()
+
+    def handle_sigterm():
+        # svc -d / svc -t send SIGTERM; quit the loop so bridge.stop() saves the counters
+        logger.info("SIGTERM received, shutting down.")
+        mainloop.quit()
+        return False
+
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, handle_sigterm)
+    try:
+        mainloop.run()
+    except KeyboardInterrupt:
+        logger.info("Script shutdown requested by user.")
+    finally:
+        bridge.stop()
+        logger.info("--- rgpio D-Bus input bridge stopped ---")
+
+def run_sysfs_bridge():
     logger.info("--- Starting rgpio driver for virtual inputs ---")
     
     gpio_base_num, trigger_path, module_capacity = manage_kernel_module(
@@ -324,6 +885,7 @@ if __name__ == "__main__":
                     logger.info("Configuration file change detected.")
                     last_config_mtime = current_mtime
                     bridge.reconfigure()
+                bridge.log_queue_stats()
             except FileNotFoundError:
                 logger.warning(f"Configuration file '{CONFIG_FILE}' not found. Skipping check.")
     except KeyboardInterrupt:
@@ -337,3 +899,9 @@ if __name__ == "__main__":
         )
         logger.info("--- rgpio driver stopped ---")
 
+if __name__ == "__main__":
+    bridge_mode, _, _ = get_input_bridge_config(CONFIG_FILE)
+    if bridge_mode == 'dbus':
+        run_dbus_bridge()
+    else:
+        run_sysfs_bridge()